@@ -1,6 +1,8 @@
 import streamlit as st
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from router.query_router import QueryRouter
@@ -8,11 +10,71 @@ from evaluation.evaluator import Evaluator
 from config import Config
 
 
+@st.cache_data(show_spinner=False)
+def list_reports(reports_dir, dir_mtime):
+    """Index report metadata, newest first (dir_mtime keys the cache)"""
+    reports = []
+    with os.scandir(reports_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            file_stats = entry.stat()
+            reports.append({
+                "name": entry.name,
+                "path": entry.path,
+                "mtime": file_stats.st_mtime,
+                "size": file_stats.st_size
+            })
+
+    reports.sort(key=lambda report: report["mtime"], reverse=True)
+    return reports
+
+
+@st.cache_data(show_spinner=False)
+def load_report(report_path, mtime):
+    """Read a report once per file version (mtime keys the cache)"""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        if report_path.lower().endswith(".json"):
+            return json.load(f)
+        return f.read()
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cache_file(cache_file, mtime):
+    """Parse the cache file once per version, without copying per rerun"""
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cache_row(query, record):
+    """Build the table row for one cache entry"""
+    return {
+        "Query": query,
+        "Complexity": record.get("complexity", "unknown"),
+        "Model": record.get("model", "unknown"),
+        "Date": record.get("date", "-"),
+        "Length": record.get(
+            "response_length",
+            len(record.get("response", ""))
+        )
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_router(model_provider):
+    """Keep one router per provider alive across reruns"""
+    return QueryRouter(model_provider)
+
+
 class DynamicRoutingUI:
     def __init__(self):
         """Initialize the UI components"""
         self.config = Config()
-        self.router = QueryRouter()
+        self.config.MODEL_PROVIDER = st.session_state.get(
+            "model_provider",
+            self.config.MODEL_PROVIDER
+        )
+        self.router = get_router(self.config.MODEL_PROVIDER)
         self.evaluator = Evaluator()
         self.setup_page_config()
 
@@ -38,14 +100,15 @@ class DynamicRoutingUI:
 
         if model_provider != self.config.MODEL_PROVIDER:
             self.config.MODEL_PROVIDER = model_provider
-            self.router = QueryRouter()
+            st.session_state.model_provider = model_provider
+            self.router = get_router(model_provider)
             st.sidebar.success(f"Switched to {model_provider} mode")
 
         # Model Level Selection
         st.sidebar.subheader("Model Level")
         model_level = st.sidebar.selectbox(
             "Select Model Level",
-            ["auto", "simple", "medium", "advanced"],
+            ["auto", "simple", "medium", "advanced", "compare"],
             index=0
         )
 
@@ -88,7 +151,13 @@ class DynamicRoutingUI:
             show_details = st.checkbox("Show Response Details")
 
         # Process query
-        if send_button and query.strip():
+        if (
+            send_button and query.strip()
+            and st.session_state.get('model_level') == 'compare'
+        ):
+            self.render_comparison(query)
+
+        elif send_button and query.strip():
             with st.spinner("Processing query..."):
                 try:
                     # Start timing
@@ -100,11 +169,12 @@ class DynamicRoutingUI:
                     # Route query with specific model level if not auto
                     if model_level == 'auto':
                         result = self.router.route_query_and_return_response(
-                            query
+                            query,
+                            sla="interactive"
                         )
                     else:
                         # Use specific model level
-                        response = self.router.model.generate(
+                        response = self.router.generate_at_level(
                             query,
                             model_level
                         )
@@ -158,6 +228,49 @@ class DynamicRoutingUI:
         elif send_button and not query.strip():
             st.warning("Please enter a query before sending.")
 
+    def render_comparison(self, query):
+        """Query every model level at once and show answers side by side"""
+        levels = self.config.MODEL_LEVELS
+        placeholders = {}
+
+        for column, level in zip(st.columns(len(levels)), levels):
+            with column:
+                st.subheader(level.title())
+                st.caption(self.router._get_model_name(level))
+                placeholders[level] = st.empty()
+                placeholders[level].info("Waiting for response...")
+
+        # Worker threads only call the model; rendering stays on the
+        # script thread, filling each column as its answer arrives
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(levels)) as executor:
+            futures = {
+                executor.submit(
+                    self.router.generate_at_level,
+                    query,
+                    level
+                ): level
+                for level in levels
+            }
+
+            for future in as_completed(futures):
+                level = futures[future]
+                elapsed = time.time() - start_time
+
+                with placeholders[level].container():
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        st.error(f"Error from {level} model: {str(e)}")
+                        continue
+
+                    metric_col1, metric_col2 = st.columns(2)
+                    metric_col1.metric("Latency", f"{elapsed:.2f}s")
+                    metric_col2.metric("Length", f"{len(response)} chars")
+                    st.write(response)
+
+        st.caption(f"Total wait: {time.time() - start_time:.2f}s")
+
     def render_evaluation_tab(self):
         """Render the evaluation results tab"""
         st.subheader("Evaluation Results")
@@ -169,47 +282,36 @@ class DynamicRoutingUI:
             st.info("No evaluation reports found. Run an evaluation first.")
             return
 
-        # Get latest report
-        report_files = [
-            f for f in os.listdir(reports_dir)
-        ]
+        # Report list is only rebuilt when the directory changes
+        reports = list_reports(reports_dir, os.path.getmtime(reports_dir))
 
-        if not report_files:
+        if not reports:
             st.info("No evaluation reports found.")
             return
 
-        # Sort by modification time
-        report_files.sort(
-            key=lambda x: os.path.getmtime(
-                os.path.join(reports_dir, x)
-            ), reverse=True)
-
-        # Display report selector
-        selected_report = st.selectbox(
+        # Display report selector (index is already newest first)
+        selected_index = st.selectbox(
             "Select Report:",
-            report_files,
+            range(len(reports)),
+            format_func=lambda i: reports[i]["name"],
             index=0
         )
-
-        # Display report content
-        report_path = os.path.join(reports_dir, selected_report)
+        selected_report = reports[selected_index]
 
         try:
-            st.subheader(f"Report: {selected_report}")
-            if selected_report.lower().endswith(".json"):
-                with open(report_path, 'r', encoding='utf-8') as f:
-                    report_json = json.load(f)
-                st.json(report_json)
-            else:
-                with open(report_path, 'r', encoding='utf-8') as f:
-                    report_content = f.read()
+            st.subheader(f"Report: {selected_report['name']}")
+            report_content = load_report(
+                selected_report["path"],
+                selected_report["mtime"]
+            )
+            if isinstance(report_content, str):
                 st.text(report_content)
+            else:
+                st.json(report_content)
 
             # Report metadata
-            file_stats = os.stat(report_path)
-            st.caption(f"Last modified: {datetime.fromtimestamp(
-                file_stats.st_mtime
-            )}")
+            modified = datetime.fromtimestamp(selected_report["mtime"])
+            st.caption(f"Last modified: {modified}")
 
         except Exception as e:
             st.error(f"Error reading report: {str(e)}")
@@ -247,14 +349,126 @@ class DynamicRoutingUI:
             return
 
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-
-            # Display JSON content
-            st.json(cache_data)
-
+            # Parsed once per file version, shared across reruns
+            cache_data = load_cache_file(
+                cache_file,
+                os.path.getmtime(cache_file)
+            )
         except Exception as e:
             st.error(f"Error loading cache: {str(e)}")
+            return
+
+        # Search and pagination controls
+        search_col, size_col = st.columns([3, 1])
+
+        with search_col:
+            search = st.text_input(
+                "Search cached queries:",
+                placeholder="Filter by query text..."
+            )
+
+        with size_col:
+            page_size = st.selectbox("Rows per page", [10, 25, 50, 100])
+
+        queries = list(cache_data.keys())
+        if search.strip():
+            needle = search.strip().lower()
+            queries = [q for q in queries if needle in q.lower()]
+
+        if not queries:
+            st.info("No cached entries match your search.")
+            return
+
+        page_count = (len(queries) - 1) // page_size + 1
+        page = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            value=1
+        )
+
+        # Only build rows for the entries on the current page
+        start = (page - 1) * page_size
+        page_queries = queries[start:start + page_size]
+        rows = [
+            cache_row(query, cache_data[query]) for query in page_queries
+        ]
+
+        st.caption(
+            f"Showing {start + 1}-{start + len(rows)} of "
+            f"{len(queries)} entries"
+        )
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+        # Per-entry detail on demand
+        selected_query = st.selectbox(
+            "Show entry details:",
+            [None] + page_queries,
+            format_func=lambda q: "-" if q is None else q
+        )
+
+        if selected_query is not None:
+            record = cache_data[selected_query]
+            with st.expander("Cached Response", expanded=True):
+                st.write(f"**Model:** {record.get('model', 'unknown')}")
+                st.write(
+                    f"**Complexity:** {record.get('complexity', 'unknown')}"
+                )
+                st.write(f"**Date:** {record.get('date', '-')}")
+                st.write(record.get("response", ""))
+
+    def render_memory_tab(self):
+        """Render the memory accounting tab"""
+        st.subheader("Memory Usage")
+
+        sampler = self.router.memory_sampler
+        sampling = st.checkbox(
+            "Enable tracemalloc sampling",
+            value=sampler.running
+        )
+        if sampling and not sampler.running:
+            sampler.start()
+        elif not sampling and sampler.running:
+            sampler.stop()
+
+        report = self.router.memory_report(top_n=10)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Retained", f"{report['total_bytes']:,} B")
+        col2.metric("Cache Entries", report["cache"]["entries"])
+        col3.metric(
+            "Bytes / Cache Entry",
+            f"{report['cache']['bytes_per_entry']:,.0f}"
+        )
+        requests = report["requests"]
+        col4.metric(
+            "Bytes / Request",
+            f"{requests['average_bytes']:,.0f}"
+            if requests["measured"] else "n/a",
+            help="Measured while tracemalloc sampling is enabled"
+        )
+
+        st.write("**Top Consumers:**")
+        st.dataframe(
+            report["top_consumers"],
+            use_container_width=True,
+            hide_index=True
+        )
+
+        if report["tracemalloc"]["running"]:
+            tracing = report["tracemalloc"]
+            st.write(
+                f"**tracemalloc:** current {tracing['current_bytes']:,} B, "
+                f"peak {tracing['peak_bytes']:,} B"
+            )
+            st.dataframe(
+                tracing["top_allocations"],
+                use_container_width=True,
+                hide_index=True
+            )
+
+        with st.expander("Full Report"):
+            st.json(report)
 
     def render_tabs(self):
         """Render main application tabs"""
@@ -262,7 +476,8 @@ class DynamicRoutingUI:
             "Query Interface",
             "Evaluation Results",
             "Test Queries",
-            "Cache"
+            "Cache",
+            "Memory"
         ])
 
         with tabs[0]:
@@ -277,6 +492,9 @@ class DynamicRoutingUI:
         with tabs[3]:
             self.render_cache_tab()
 
+        with tabs[4]:
+            self.render_memory_tab()
+
     def render_header(self):
         """Render application header"""
         st.title("Dynamic Routing System")
@@ -1,11 +1,23 @@
+import os
+import copy
+import json
+from functools import lru_cache
 from dotenv import load_dotenv
 
 
+@lru_cache(maxsize=8)
+def _read_profile(path, mtime):
+    # mtime is part of the key so edited profiles are picked up
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 class Config:
     def __init__(self):
         load_dotenv()
 
-        self.MODEL_PROVIDER = "gemini"  # Options: "gemini", "mock"
+        # Options: "gemini", "mock", or any name added via register_provider
+        self.MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "gemini")
         self.MODEL_LEVELS = ["simple", "medium", "advanced"]
 
         self.SIMPLE_MODEL = "gemini-1.5-flash-latest"
@@ -16,9 +28,90 @@ class Config:
         self.MAX_MEDIUM_LENGTH = 200
 
         self.CACHE_ENABLED = False
+        # Cached answers are served as-is until the soft TTL, served and
+        # refreshed in the background until the hard TTL, then dropped
+        self.CACHE_SOFT_TTL = {
+            "simple": 7 * 24 * 3600,
+            "medium": 3 * 24 * 3600,
+            "advanced": 24 * 3600
+        }
+        self.CACHE_HARD_TTL = {
+            "simple": 30 * 24 * 3600,
+            "medium": 14 * 24 * 3600,
+            "advanced": 7 * 24 * 3600
+        }
+        self.CACHE_REFRESH_WORKERS = 1
         self.FALLBACK_ENABLED = True
         self.MAX_RETRIES = 2
 
+        # Remember the level a query escalated to, so repeats skip the
+        # cheaper levels that already failed for it
+        self.ESCALATION_MEMORY_ENABLED = True
+        self.ESCALATION_MEMORY_TTL = 3600  # seconds
+        self.ESCALATION_MEMORY_MAX_ENTRIES = 10000
+
+        # Upstream calls per level are cut off after these many seconds
+        self.LEVEL_TIMEOUTS = {
+            "simple": 15,
+            "medium": 30,
+            "advanced": 60
+        }
+
+        # Open a level's circuit after this many consecutive failures, then
+        # probe it again once the recovery timeout has passed
+        self.BREAKER_FAILURE_THRESHOLD = 3
+        self.BREAKER_RECOVERY_TIMEOUT = 30  # seconds
+
+        # Upstream calls in flight per level, shared by all traffic. When
+        # both lanes have work, interactive gets 8 slots for each bulk one
+        self.LEVEL_CONCURRENCY = {
+            "simple": 4,
+            "medium": 2,
+            "advanced": 2
+        }
+        self.PRIORITY_WEIGHTS = {
+            "interactive": 8,
+            "bulk": 1
+        }
+
+        # Starting guesses (seconds) for deadline routing, refined from
+        # observed calls
+        self.LEVEL_LATENCY_ESTIMATES = {
+            "simple": 2,
+            "medium": 6,
+            "advanced": 20
+        }
+        self.LATENCY_SMOOTHING = 0.2
+        # Observed estimates drift back to the starting guesses with this
+        # half-life (seconds), so a slow spell does not rule a level out
+        self.LATENCY_DECAY_HALF_LIFE = 300
+
+        # Default latency budget (seconds) per traffic class, None = no limit
+        self.SLA_BUDGETS = {
+            "interactive": 30,
+            "batch": None
+        }
+
+        # Output token limits; answers are shortened when time is tight
+        self.LEVEL_MAX_TOKENS = {
+            "simple": 2048,
+            "medium": 4096,
+            "advanced": 8192
+        }
+        self.MIN_DEADLINE_TOKENS = 256
+
+        # Group requests for the same level into one generate_batch call,
+        # waiting at most BATCH_WINDOW seconds for up to BATCH_MAX_SIZE.
+        # Only providers with a native generate_batch are batched
+        self.MICRO_BATCHING_ENABLED = False
+        self.BATCH_LEVELS = ["simple"]
+        self.BATCH_WINDOW = 0.02  # seconds
+        self.BATCH_MAX_SIZE = 16
+
+        # Simulated mock provider latency (seconds), for benchmarking
+        self.MOCK_CALL_OVERHEAD = 0.0
+        self.MOCK_ITEM_LATENCY = 0.0
+
         self.COMPLEX_KEYWORDS = [
             "analyze", "compare", "contrast", "evaluate", "critique",
             "interpret", "discuss", "theorize", "synthesize", "examine",
@@ -32,6 +125,18 @@ class Config:
             "identify", "state", "mention", "recall", "recognize"
         ]
 
+        # Relative cost of one query per level, used when tuning the
+        # classifier
+        self.LEVEL_COSTS = {
+            "simple": 1,
+            "medium": 4,
+            "advanced": 20
+        }
+
+        # Check answers while they stream and stop generating as soon as
+        # the opening is one of the INVALID_PHRASES
+        self.STREAM_VALIDATION_ENABLED = True
+
         self.INVALID_PHRASES = [
             "i don't know",
             "i'm not sure",
@@ -43,3 +148,26 @@ class Config:
             "i don't understand",
             "i can't answer"
         ]
+
+        # Tuned classifier settings (see evaluation/threshold_tuner.py)
+        # override the defaults above when the profile file exists
+        self.CLASSIFIER_PROFILE = os.getenv(
+            "CLASSIFIER_PROFILE",
+            os.path.join("data", "profiles", "classifier.json")
+        )
+        self._load_classifier_profile()
+
+    def _load_classifier_profile(self):
+        if not os.path.exists(self.CLASSIFIER_PROFILE):
+            return
+
+        profile = _read_profile(
+            self.CLASSIFIER_PROFILE,
+            os.path.getmtime(self.CLASSIFIER_PROFILE)
+        )
+        for key in ("MAX_SIMPLE_LENGTH", "MAX_MEDIUM_LENGTH",
+                    "COMPLEX_KEYWORDS", "SIMPLE_KEYWORDS"):
+            # The parsed profile is shared through the cache; copy it so
+            # editing one Config does not change every other one
+            if key in profile:
+                setattr(self, key, copy.deepcopy(profile[key]))
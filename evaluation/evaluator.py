@@ -2,6 +2,8 @@ import time
 import json
 import os
 from datetime import datetime
+from config import Config
+from router.rules import classify_query
 
 
 class Evaluator:
@@ -39,7 +41,9 @@ class Evaluator:
             query_start = time.time()
             response = router.route_query_and_return_response(
                 query,
-                use_cache=True
+                use_cache=True,
+                sla="batch",
+                priority="bulk"
                 )
             
             query_time = time.time() - query_start
@@ -79,7 +83,11 @@ class Evaluator:
         for query_data in queries:
             query = query_data["text"]
             query_start = time.time()
-            response = router.model.generate(query, model_level)
+            response = router.generate_at_level(
+                query,
+                model_level,
+                priority="bulk"
+            )
             query_time = time.time() - query_start
             
             results.append({
@@ -124,6 +132,128 @@ class Evaluator:
         print("EVALUATION COMPLETE")
         print("="*60)
 
+    def evaluate_classification(self, queries_file=None, classifier=None,
+                                batch_size=50000):
+        # Routing accuracy without any model calls. Defaults to the real
+        # classify_query; any classifier(query) -> level can be plugged in
+        import numpy as np
+        from evaluation.threshold_tuner import load_labeled_queries
+
+        config = Config()
+        if classifier is None:
+            def classifier(query):
+                return classify_query(query, config)
+
+        levels = config.MODEL_LEVELS
+        level_index = {level: i for i, level in enumerate(levels)}
+        texts, labels = load_labeled_queries(
+            queries_file or self.test_queries_file
+        )
+
+        print(f"Classifying {len(texts)} queries...")
+        start_time = time.time()
+        confusion = np.zeros((len(levels), len(levels)), dtype=np.int64)
+
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            batch_labels = labels[start:start + batch_size]
+            true = np.array(
+                [level_index[label] for label in batch_labels],
+                dtype=np.int64
+            )
+
+            predicted = np.array(
+                [level_index[classifier(query)] for query in batch],
+                dtype=np.int64
+            )
+
+            # confusion[true, predicted] counts
+            confusion += np.bincount(
+                true * len(levels) + predicted,
+                minlength=len(levels) ** 2
+            ).reshape(len(levels), len(levels))
+
+        total_time = time.time() - start_time
+        result = self._classification_metrics(confusion, levels, config)
+        result.update({
+            "test_type": "Classification Only",
+            "queries_tested": len(texts),
+            "total_time": total_time
+        })
+
+        self._print_classification(result)
+        self._save_report(result, "classification")
+        return result
+
+    def _classification_metrics(self, confusion, levels, config):
+        import numpy as np
+
+        total = confusion.sum()
+        correct = np.diag(confusion)
+        predicted = confusion.sum(axis=0)
+        actual = confusion.sum(axis=1)
+
+        per_class = {}
+        for i, level in enumerate(levels):
+            precision = correct[i] / predicted[i] if predicted[i] else 0.0
+            recall = correct[i] / actual[i] if actual[i] else 0.0
+            f1 = (
+                2 * precision * recall / (precision + recall)
+                if precision + recall else 0.0
+            )
+            per_class[level] = {
+                "precision": float(precision) * 100,
+                "recall": float(recall) * 100,
+                "f1": float(f1) * 100,
+                "support": int(actual[i])
+            }
+
+        traffic_share = {
+            level: float(predicted[i] / total) * 100 if total else 0.0
+            for i, level in enumerate(levels)
+        }
+        expected_cost = sum(
+            traffic_share[level] / 100 * config.LEVEL_COSTS[level]
+            for level in levels
+        )
+
+        return {
+            "accuracy": float(correct.sum() / total) * 100 if total else 0.0,
+            "per_class": per_class,
+            "confusion_matrix": {
+                "labels": levels,
+                "rows_true_columns_predicted": confusion.tolist()
+            },
+            "traffic_share": traffic_share,
+            "expected_cost": expected_cost
+        }
+
+    def _print_classification(self, result):
+        levels = result["confusion_matrix"]["labels"]
+        matrix = result["confusion_matrix"]["rows_true_columns_predicted"]
+
+        print("="*60)
+        print("CLASSIFICATION RESULTS")
+        print("-"*40)
+        print(f"Queries: {result['queries_tested']}")
+        print(f"Time: {result['total_time']:.2f}s")
+        print(f"Accuracy: {result['accuracy']:.1f}%")
+
+        print("-"*40)
+        print(f"{'':>10}" + "".join(f"{level:>10}" for level in levels))
+        for level, row in zip(levels, matrix):
+            print(f"{level:>10}" + "".join(f"{count:>10}" for count in row))
+
+        print("-"*40)
+        for level, metrics in result["per_class"].items():
+            print(f"{level}: precision {metrics['precision']:.1f}%, "
+                  f"recall {metrics['recall']:.1f}%, "
+                  f"f1 {metrics['f1']:.1f}%, "
+                  f"traffic {result['traffic_share'][level]:.1f}%")
+        print(f"Expected relative cost per query: "
+              f"{result['expected_cost']:.2f}")
+        print("="*60)
+
     def _print_results(self, results):
         print("RESULTS SUMMARY")
         print("-"*40)
@@ -149,11 +279,14 @@ class Evaluator:
         )
 
     def _save_results(self, results):
+        self._save_report(results, "evaluation")
+
+    def _save_report(self, results, prefix):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_dir = os.path.join("data", "evaluation_reports")
         os.makedirs(report_dir, exist_ok=True)
 
-        report_file = os.path.join(report_dir, f"evaluation_{timestamp}.json")
+        report_file = os.path.join(report_dir, f"{prefix}_{timestamp}.json")
 
         with open(report_file, 'w') as f:
             # dump(content, file path, space=2, keep non-ASCII chars)
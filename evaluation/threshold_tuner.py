@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import Config
+from router.rules import SIMPLE_FACTUAL_PATTERN
+
+
+def load_labeled_queries(path):
+    """Read {"queries": [{"text", "true_label"}]} JSON or JSON lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)["queries"]
+
+    texts = [record["text"] for record in records]
+    labels = [record["true_label"] for record in records]
+    return texts, labels
+
+
+def extract_features(texts, keywords):
+    """Precompute everything classify_query looks at, once per corpus."""
+    lowered = [text.lower() for text in texts]
+    count = len(texts)
+
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int32,
+                          count=count)
+    factual = np.fromiter(
+        (SIMPLE_FACTUAL_PATTERN.match(text) is not None for text in lowered),
+        dtype=bool,
+        count=count
+    )
+
+    # keyword_hits[i, k] is True when keyword k occurs in query i
+    keyword_hits = np.zeros((count, len(keywords)), dtype=bool)
+    for k, keyword in enumerate(keywords):
+        keyword_hits[:, k] = np.fromiter(
+            (keyword in text for text in lowered),
+            dtype=bool,
+            count=count
+        )
+
+    return {
+        "lengths": lengths,
+        "factual": factual,
+        "keyword_hits": keyword_hits
+    }
+
+
+class ThresholdTuner:
+    def __init__(self, texts, labels, config=None):
+        self.config = config or Config()
+        self.levels = self.config.MODEL_LEVELS
+        self.keywords = list(self.config.COMPLEX_KEYWORDS)
+
+        level_index = {level: i for i, level in enumerate(self.levels)}
+        self.labels = np.array([level_index[label] for label in labels],
+                               dtype=np.int8)
+        self.features = extract_features(texts, self.keywords)
+
+        self.level_costs = np.array(
+            [self.config.LEVEL_COSTS[level] for level in self.levels],
+            dtype=np.float64
+        )
+        self.level_latencies = np.array(
+            [self.config.LEVEL_LATENCY_ESTIMATES[level]
+             for level in self.levels],
+            dtype=np.float64
+        )
+
+    def keyword_subsets(self, random_subsets=64, seed=0):
+        """Full list, every leave-one-out list, plus random subsets."""
+        keyword_count = len(self.keywords)
+        subsets = [np.ones(keyword_count, dtype=bool)]
+
+        for k in range(keyword_count):
+            mask = np.ones(keyword_count, dtype=bool)
+            mask[k] = False
+            subsets.append(mask)
+
+        rng = np.random.default_rng(seed)
+        for _ in range(random_subsets):
+            subsets.append(rng.random(keyword_count) < 0.5)
+
+        return subsets
+
+    def search(self, simple_lengths, medium_lengths, keyword_subsets):
+        lengths = self.features["lengths"]
+        query_count = len(lengths)
+        simple_lengths = np.asarray(simple_lengths)
+        medium_lengths = np.asarray(medium_lengths)
+
+        # simple[s, i]: query i goes to the simple model at threshold s
+        simple = (
+            (lengths[None, :] <= simple_lengths[:, None])
+            & self.features["factual"][None, :]
+        ).astype(np.float64)
+        in_medium_range = lengths[None, :] <= medium_lengths[:, None]
+        is_simple_label = (self.labels == 0).astype(np.float64)
+        simple_correct = simple @ is_simple_label
+        simple_count = simple.sum(axis=1)
+
+        results = []
+        for mask in keyword_subsets:
+            has_complex = self.features["keyword_hits"][:, mask].any(axis=1)
+
+            # Level chosen for queries that are not routed to simple
+            medium = (in_medium_range & ~has_complex[None, :])
+            other_level = np.where(medium, 1, 2)
+            other_correct = (other_level == self.labels[None, :]).astype(
+                np.float64
+            )
+            medium = medium.astype(np.float64)
+
+            # Correct = right simple picks + right picks among the rest,
+            # for every (simple, medium) threshold pair at once
+            correct = (
+                simple_correct[:, None]
+                + other_correct.sum(axis=1)[None, :]
+                - simple @ other_correct.T
+            )
+            medium_count = medium.sum(axis=1)[None, :] - simple @ medium.T
+            advanced_count = (
+                query_count - simple_count[:, None] - medium_count
+            )
+
+            shares = np.stack([
+                np.broadcast_to(simple_count[:, None], correct.shape),
+                medium_count,
+                advanced_count
+            ], axis=-1) / query_count
+
+            accuracy = correct / query_count * 100
+            cost = shares @ self.level_costs
+            latency = shares @ self.level_latencies
+
+            keywords = [k for k, keep in zip(self.keywords, mask) if keep]
+            for s, max_simple in enumerate(simple_lengths):
+                for m, max_medium in enumerate(medium_lengths):
+                    if max_medium < max_simple:
+                        continue
+                    results.append({
+                        "MAX_SIMPLE_LENGTH": int(max_simple),
+                        "MAX_MEDIUM_LENGTH": int(max_medium),
+                        "COMPLEX_KEYWORDS": keywords,
+                        "accuracy": float(accuracy[s, m]),
+                        "expected_cost": float(cost[s, m]),
+                        "expected_latency": float(latency[s, m]),
+                        "traffic_share": dict(zip(
+                            self.levels,
+                            (float(x) for x in shares[s, m])
+                        ))
+                    })
+
+        return results
+
+    def frontier(self, results):
+        """Settings no other setting beats on both accuracy and cost."""
+        ordered = sorted(
+            results,
+            key=lambda r: (r["expected_cost"], -r["accuracy"])
+        )
+        frontier = []
+        best_accuracy = -1.0
+        for result in ordered:
+            if result["accuracy"] > best_accuracy:
+                frontier.append(result)
+                best_accuracy = result["accuracy"]
+        return frontier
+
+    def choose(self, results, max_cost=None):
+        candidates = [
+            r for r in results
+            if max_cost is None or r["expected_cost"] <= max_cost
+        ]
+        if not candidates:
+            return None
+        return max(
+            candidates,
+            key=lambda r: (r["accuracy"], -r["expected_cost"])
+        )
+
+    def save_profile(self, result, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profile = {
+            "MAX_SIMPLE_LENGTH": result["MAX_SIMPLE_LENGTH"],
+            "MAX_MEDIUM_LENGTH": result["MAX_MEDIUM_LENGTH"],
+            "COMPLEX_KEYWORDS": result["COMPLEX_KEYWORDS"],
+            "SIMPLE_KEYWORDS": list(self.config.SIMPLE_KEYWORDS),
+            "tuning": {
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "queries": int(len(self.labels)),
+                "accuracy": result["accuracy"],
+                "expected_cost": result["expected_cost"],
+                "expected_latency": result["expected_latency"],
+                "traffic_share": result["traffic_share"]
+            }
+        }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(
+        description="Grid search classify_query thresholds and keywords"
+    )
+    parser.add_argument(
+        "corpus",
+        nargs="?",
+        default=os.path.join("data", "test_queries.json"),
+        help="labeled queries (.json or .jsonl)"
+    )
+    parser.add_argument("--output", default=config.CLASSIFIER_PROFILE)
+    parser.add_argument("--max-cost", type=float, default=None,
+                        help="best accuracy under this expected cost")
+    parser.add_argument("--random-subsets", type=int, default=64)
+    args = parser.parse_args()
+
+    texts, labels = load_labeled_queries(args.corpus)
+    start_time = time.time()
+    tuner = ThresholdTuner(texts, labels, config)
+    feature_time = time.time() - start_time
+
+    start_time = time.time()
+    subsets = tuner.keyword_subsets(args.random_subsets)
+    results = tuner.search(
+        np.arange(10, 151, 5),
+        np.arange(50, 501, 25),
+        subsets
+    )
+    search_time = time.time() - start_time
+
+    print(f"Queries: {len(texts)}")
+    print(f"Features: {feature_time:.2f}s")
+    print(f"Combinations: {len(results)} in {search_time:.2f}s")
+    print("-"*60)
+    print("Accuracy / cost frontier:")
+    for result in tuner.frontier(results):
+        print(f"  accuracy {result['accuracy']:5.1f}%  "
+              f"cost {result['expected_cost']:6.2f}  "
+              f"latency {result['expected_latency']:6.2f}s  "
+              f"simple<={result['MAX_SIMPLE_LENGTH']}  "
+              f"medium<={result['MAX_MEDIUM_LENGTH']}  "
+              f"keywords={len(result['COMPLEX_KEYWORDS'])}")
+
+    chosen = tuner.choose(results, args.max_cost)
+    if chosen is None:
+        print("No setting fits the requested cost")
+        return
+
+    tuner.save_profile(chosen, args.output)
+    print("-"*60)
+    print(f"Chosen: accuracy {chosen['accuracy']:.1f}%, "
+          f"cost {chosen['expected_cost']:.2f}")
+    print(f"Profile saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
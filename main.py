@@ -1,9 +1,14 @@
+import time
 import os
 import sys
-from router.query_router import QueryRouter
-from models.gemini_models import GeminiModels
-from evaluation.evaluator import Evaluator
-from config import Config
+
+# Measured from before the application imports
+STARTUP_BEGIN = time.perf_counter()
+
+from router.query_router import QueryRouter  # noqa: E402
+from models.registry import get_provider  # noqa: E402
+from evaluation.evaluator import Evaluator  # noqa: E402
+from config import Config  # noqa: E402
 
 sys.path.insert(
     0,
@@ -19,6 +24,7 @@ class DynamicRoutingApp:
         self.router = QueryRouter()
         self.evaluator = Evaluator()
         self.running = True
+        self.startup_time = time.perf_counter() - STARTUP_BEGIN
 
     def print_header(self):
         print("="*50)
@@ -26,17 +32,31 @@ class DynamicRoutingApp:
         print("CACHE_ENABLED: ", self.config.CACHE_ENABLED)
         print("FALLBACK_ENABLED: ", self.config.FALLBACK_ENABLED)
         print("MAX_RETRIES: ", self.config.MAX_RETRIES)
+        print(f"STARTUP_TIME: {self.startup_time:.3f}s")
         print("="*50)
 
         print("type 'exit' to Quit application")
         print("type 'evaluate' to run evaluation")
         print("type 'list' to show all available LLMs")
+        print("type 'classify [file]' to evaluate routing accuracy "
+              "without model calls")
+        print("type 'stats' to show router statistics")
+        print("type 'memory' to show memory usage "
+              "('memory start' / 'memory stop' for tracemalloc)")
 
         print("="*50)
 
     def process_query(self, query: str):
         self.evaluator.start_timer()
-        result = self.router.route_query_and_return_response(query)
+        try:
+            result = self.router.route_query_and_return_response(
+                query,
+                sla="interactive"
+            )
+        except Exception as e:
+            self.evaluator.stop_timer()
+            print(f"Error processing query: {str(e)}")
+            return
         elapsed = self.evaluator.stop_timer()
         self.display_result(result, elapsed)
 
@@ -46,10 +66,68 @@ class DynamicRoutingApp:
         print("complexity: ", result["complexity"])
         print("model: ", result["model_name"])
         print("from cache: ", result["cached"])
+        if result.get("degraded"):
+            print("degraded: no level gave a valid answer")
         print(f"Time: {elapsed_time:.3f}s")
         print("response: ", result["response"])
         print("-"*50)
 
+    def display_stats(self, stats):
+        print("-"*50)
+        cache = stats["cache"]
+        print(f"cache: {cache['hits']} hits, {cache['stale_hits']} stale, "
+              f"{cache['misses']} misses, {cache['refreshes']} refreshed")
+        memory = stats["escalation_memory"]
+        print("escalation memory entries: ", memory["entries"])
+        print(f"escalation memory hits: {memory['hits']} "
+              f"({memory['hit_rate']:.1f}%)")
+        print(f"escalation latency saved: {memory['latency_saved']:.3f}s")
+        print("refusals stopped early: ", stats["early_aborts"])
+        for level, lanes in stats["priority_lanes"].items():
+            for priority, lane in lanes.items():
+                print(f"{level} {priority} lane: {lane['queued']} queued, "
+                      f"avg wait {lane['average_wait']:.3f}s, "
+                      f"max wait {lane['max_wait']:.3f}s")
+        for level, breaker in stats["circuit_breakers"].items():
+            print(f"{level} circuit: {breaker['state']} "
+                  f"(failures: {breaker['total_failures']}, "
+                  f"rejected: {breaker['total_rejected']})")
+        print("-"*50)
+
+    def display_memory(self, report):
+        print("-"*50)
+        cache = report["cache"]
+        print(f"cache: {cache['entries']} entries, "
+              f"{cache['total_bytes']} bytes "
+              f"(~{cache['bytes_per_entry']:.0f} bytes/entry)")
+        escalation = report["escalation_memory"]
+        print(f"escalation memory: {escalation['entries']} entries, "
+              f"{escalation['total_bytes']} bytes")
+        state = report["router_state"]
+        print(f"router state: {state['total_bytes']} bytes, "
+              f"{state['queued']} queued jobs, "
+              f"{state['refreshing']['entries']} refreshing")
+        requests = report["requests"]
+        if requests["measured"]:
+            print(f"requests: {requests['count']}, "
+                  f"~{requests['average_bytes']:.0f} bytes/request")
+        else:
+            print(f"requests: {requests['count']} "
+                  f"(sizes measured while tracemalloc sampling is on)")
+        print("total retained: ", report["total_bytes"], "bytes")
+        print("top consumers:")
+        for item in report["top_consumers"]:
+            print(f"  {item['bytes']:>10} bytes  [{item['source']}] "
+                  f"{item['key']}")
+
+        sampling = report["tracemalloc"]
+        if sampling["running"]:
+            print(f"tracemalloc: current {sampling['current_bytes']} bytes, "
+                  f"peak {sampling['peak_bytes']} bytes")
+            for item in sampling["top_allocations"]:
+                print(f"  {item['bytes']:>10} bytes  {item['location']}")
+        print("-"*50)
+
     def handle_command(self, command: str):
         if command == "evaluate":
             self.evaluator.evaluate_system(self.router)
@@ -62,8 +140,27 @@ class DynamicRoutingApp:
             print("Exiting application")
             print("="*50)
 
+        elif command == "classify" or command.startswith("classify "):
+            queries_file = command[len("classify"):].strip() or None
+            self.evaluator.evaluate_classification(queries_file)
+
         elif command == "list":
-            GeminiModels().Print_all_available_Gemini_models()
+            # Only the Gemini SDK can list models; imported on demand
+            get_provider("gemini")().Print_all_available_Gemini_models()
+
+        elif command == "stats":
+            self.display_stats(self.router.get_stats())
+
+        elif command == "memory":
+            self.display_memory(self.router.memory_report())
+
+        elif command == "memory start":
+            self.router.memory_sampler.start()
+            print("tracemalloc sampling started")
+
+        elif command == "memory stop":
+            self.router.memory_sampler.stop()
+            print("tracemalloc sampling stopped")
 
         else:
             self.process_query(command)
@@ -1,11 +1,30 @@
 from abc import ABC, abstractmethod
+from typing import Optional, List
 
 
 class BaseModel(ABC):
+    # max_tokens is only passed when a deadline forces a shorter answer
     @abstractmethod
-    def generate(self, prompt: str, model_level: str):
+    def generate(self, prompt: str, model_level: str,
+                 max_tokens: Optional[int] = None):
         pass
 
+    def generate_stream(self, prompt: str, model_level: str,
+                        max_tokens: Optional[int] = None):
+        # Providers without streaming yield the whole answer as one chunk
+        kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+        yield self.generate(prompt, model_level, **kwargs)
+
+    def generate_batch(self, prompts: List[str], model_level: str):
+        # Providers without a batched endpoint answer one prompt at a time
+        return [self.generate(prompt, model_level) for prompt in prompts]
+
+    @classmethod
+    def has_native_batching(cls) -> bool:
+        # The fallback above saves no round trips and answers a whole batch
+        # one prompt after another in a single worker
+        return cls.generate_batch is not BaseModel.generate_batch
+
     @abstractmethod
     def get_model_name(self, level: str):
         pass
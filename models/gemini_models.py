@@ -1,6 +1,8 @@
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 from google import genai
+from google.genai import types
 from .base import BaseModel
 
 from config import Config
@@ -14,6 +16,7 @@ class ModelInfo:
     name: str
     supports_thinking: bool
     max_tokens: int
+    timeout: float
 
 
 class GeminiModels(BaseModel):
@@ -27,33 +30,64 @@ class GeminiModels(BaseModel):
             "simple": ModelInfo(
                 name=config.SIMPLE_MODEL,
                 supports_thinking=False,
-                max_tokens=2048
+                max_tokens=config.LEVEL_MAX_TOKENS["simple"],
+                timeout=config.LEVEL_TIMEOUTS["simple"]
             ),
             "medium": ModelInfo(
                 name=config.MEDIUM_MODEL,
                 supports_thinking=False,
-                max_tokens=4096
+                max_tokens=config.LEVEL_MAX_TOKENS["medium"],
+                timeout=config.LEVEL_TIMEOUTS["medium"]
             ),
             "advanced": ModelInfo(
                 name=config.ADVANCED_MODEL,
                 supports_thinking=True,
-                max_tokens=8192
+                max_tokens=config.LEVEL_MAX_TOKENS["advanced"],
+                timeout=config.LEVEL_TIMEOUTS["advanced"]
             ),
         }
 
     def _get_model_info(self, model_level: str):
         return self.models[model_level]
 
-    def generate(self, prompt: str, model_level: str):
+    def _generation_config(self, model_info: ModelInfo,
+                           max_tokens: Optional[int] = None):
+        # The router also enforces this, but the SDK timeout stops the
+        # hung HTTP request instead of leaving it running in the background
+        return types.GenerateContentConfig(
+            max_output_tokens=max_tokens,
+            http_options=types.HttpOptions(
+                timeout=int(model_info.timeout * 1000)
+            )
+        )
+
+    def generate(self, prompt: str, model_level: str,
+                 max_tokens: Optional[int] = None):
         model_info = self._get_model_info(model_level)
 
         response = self.client.models.generate_content(
             model=model_info.name,
-            contents=prompt
+            contents=prompt,
+            config=self._generation_config(model_info, max_tokens)
         )
 
         return response.text
 
+    def generate_stream(self, prompt: str, model_level: str,
+                        max_tokens: Optional[int] = None):
+        model_info = self._get_model_info(model_level)
+
+        stream = self.client.models.generate_content_stream(
+            model=model_info.name,
+            contents=prompt,
+            config=self._generation_config(model_info, max_tokens)
+        )
+
+        # Closing this generator stops reading the upstream stream
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
     def get_model_name(self, level: str):
         model_info = self._get_model_info(level)
         return model_info.name
@@ -1,22 +1,71 @@
+import time
+from typing import Optional, List
 from .base import BaseModel
 
+from config import Config
+
 
 class MockModel(BaseModel):
-    def __init__(self):
+    def __init__(self, call_overhead: Optional[float] = None,
+                 item_latency: Optional[float] = None):
+        config = Config()
         self.models = {
             "simple": "mock-simple",
             "medium": "mock-medium",
             "advanced": "mock-advanced"
         }
+        # Simulated round trip cost, paid once per call, and generation
+        # cost, paid once per prompt
+        self.call_overhead = (
+            config.MOCK_CALL_OVERHEAD
+            if call_overhead is None else call_overhead
+        )
+        self.item_latency = (
+            config.MOCK_ITEM_LATENCY
+            if item_latency is None else item_latency
+        )
 
-    def generate(self, prompt: str, level: str = "simple"):
+    def _respond(self, prompt: str, level: str,
+                 max_tokens: Optional[int] = None):
         text = prompt[:30] + "..."
-        return {
+        response = {
             "simple": f"Simple mock response for: {text}",
             "medium": f"Medium mock response with more detail for: {text}",
             "advanced": f"Advanced mock response with comprehensive "
                         f"analysis for: {text}"
         }.get(level, "Unknown model level")
 
+        # Roughly four characters per token
+        if max_tokens:
+            response = response[:max_tokens * 4]
+        return response
+
+    def _simulate_latency(self, item_count: int):
+        delay = self.call_overhead + self.item_latency * item_count
+        if delay > 0:
+            time.sleep(delay)
+
+    def generate(self, prompt: str, level: str = "simple",
+                 max_tokens: Optional[int] = None):
+        self._simulate_latency(1)
+        return self._respond(prompt, level, max_tokens)
+
+    def generate_stream(self, prompt: str, level: str = "simple",
+                        max_tokens: Optional[int] = None):
+        response = self._respond(prompt, level, max_tokens)
+        words = response.split(" ")
+
+        # Round trip first, then generation time spread over the chunks
+        if self.call_overhead > 0:
+            time.sleep(self.call_overhead)
+        for i, word in enumerate(words):
+            if self.item_latency > 0:
+                time.sleep(self.item_latency / len(words))
+            yield word if i == 0 else " " + word
+
+    def generate_batch(self, prompts: List[str], level: str = "simple"):
+        self._simulate_latency(len(prompts))
+        return [self._respond(prompt, level) for prompt in prompts]
+
     def get_model_name(self, level: str):
         return self.models.get(level, "mock-simple")
@@ -0,0 +1,39 @@
+import importlib
+import threading
+
+# Provider name -> "module:ClassName" (imported on first use) or a class
+_PROVIDERS = {
+    "gemini": "models.gemini_models:GeminiModels",
+    "mock": "models.mock_model:MockModel"
+}
+_lock = threading.Lock()
+
+
+def register_provider(name: str, provider):
+    """Register a provider class, or a lazy "module:ClassName" path."""
+    with _lock:
+        _PROVIDERS[name] = provider
+
+
+def available_providers():
+    return list(_PROVIDERS.keys())
+
+
+def get_provider(name: str):
+    """Return the provider class, importing its module on first use."""
+    with _lock:
+        if name not in _PROVIDERS:
+            raise ValueError(f"Unknown model provider: {name}")
+
+        provider = _PROVIDERS[name]
+        if isinstance(provider, str):
+            module_name, class_name = provider.split(":")
+            module = importlib.import_module(module_name)
+            provider = getattr(module, class_name)
+            _PROVIDERS[name] = provider
+
+        return provider
+
+
+def create_model(name: str):
+    return get_provider(name)()
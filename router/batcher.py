@@ -0,0 +1,186 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any
+from router.memory import deep_sizeof
+
+
+class MicroBatcher:
+    def __init__(self, model, levels, window: float, max_size: int,
+                 dispatch=None):
+        self.model = model
+        # Optional dispatch(level, priority, fn, *args) -> Future used to
+        # run each batched call, e.g. through the priority lanes
+        self.dispatch = dispatch or self._run_inline
+        self.levels = levels
+        self.window = window
+        self.max_size = max_size
+        self.queues = {level: queue.Queue() for level in levels}
+        self.workers = {}
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def handles(self, level: str):
+        return level in self.queues
+
+    def submit(self, prompt: str, level: str,
+               priority: str = "interactive") -> Future:
+        self._ensure_worker(level)
+        future = Future()
+        self.queues[level].put((prompt, priority, future))
+        return future
+
+    def _ensure_worker(self, level: str):
+        with self._lock:
+            if level not in self.workers:
+                worker = threading.Thread(
+                    target=self._run,
+                    args=(level,),
+                    daemon=True
+                )
+                worker.start()
+                self.workers[level] = worker
+
+    def _collect(self, level: str):
+        # Block for the first request, then gather more until the window
+        # closes or the batch is full
+        batch = [self.queues[level].get()]
+        window_end = time.time() + self.window
+
+        while len(batch) < self.max_size:
+            remaining = window_end - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queues[level].get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self, level: str):
+        while True:
+            # Drop requests whose caller already gave up
+            batch = [
+                item for item in self._collect(level)
+                if item[2].set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            # A batch runs in the lane of its most urgent request
+            priorities = {priority for _, priority, _ in batch}
+            priority = (
+                "interactive" if "interactive" in priorities
+                else priorities.pop()
+            )
+
+            # Hand results back when the call finishes and go straight back
+            # to collecting, so the lane can run several batches at once
+            try:
+                done = self.dispatch(
+                    level,
+                    priority,
+                    self._generate,
+                    batch,
+                    level
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            done.add_done_callback(
+                lambda done, batch=batch: self._deliver(batch, done)
+            )
+
+    def _run_inline(self, level: str, priority: str, fn, *args) -> Future:
+        # Without lanes each batched call runs on the batching thread
+        done = Future()
+        try:
+            done.set_result(fn(*args))
+        except Exception as e:
+            done.set_exception(e)
+        return done
+
+    def _deliver(self, batch, done: Future):
+        try:
+            responses = done.result()
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), response in zip(batch, responses):
+            future.set_result(response)
+
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+    def _generate(self, batch, level: str):
+        # Callers time the model from here, not from when they queued
+        started_at = time.time()
+        for _, _, future in batch:
+            future.started_at = started_at
+
+        prompts = [prompt for prompt, _, _ in batch]
+        return self.model.generate_batch(prompts, level)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "levels": list(self.levels),
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch_size": (
+                self.items / self.batches if self.batches else 0.0
+            ),
+            "largest_batch": self.largest_batch,
+            "queued": {
+                level: level_queue.qsize()
+                for level, level_queue in self.queues.items()
+            }
+        }
+
+    def memory_report(self) -> Dict[str, Any]:
+        report = {}
+        for level, level_queue in self.queues.items():
+            with level_queue.mutex:
+                pending = [prompt for prompt, _, _ in level_queue.queue]
+            report[level] = {
+                "queued": len(pending),
+                "bytes": deep_sizeof(pending)
+            }
+        return report
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+    from models.mock_model import MockModel
+
+    # Upstream quota allows a few calls in flight; the batcher uses one
+    query_count = 64
+    upstream_calls = 4
+    model = MockModel(call_overhead=0.1, item_latency=0.005)
+    queries = [f"What is item {i}?" for i in range(query_count)]
+
+    with ThreadPoolExecutor(max_workers=upstream_calls) as executor:
+        start_time = time.time()
+        list(executor.map(lambda q: model.generate(q, "simple"), queries))
+        direct_time = time.time() - start_time
+
+    batcher = MicroBatcher(model, ["simple"], window=0.02, max_size=16)
+    start_time = time.time()
+    futures = [batcher.submit(query, "simple") for query in queries]
+    for future in futures:
+        future.result()
+    batched_time = time.time() - start_time
+
+    print(f"Direct:  {query_count / direct_time:.1f} queries/s "
+          f"({query_count} calls)")
+    print(f"Batched: {query_count / batched_time:.1f} queries/s "
+          f"({batcher.batches} calls)")
@@ -1,9 +1,11 @@
 import time
 import json
 import os
+import threading
 from datetime import datetime
 from typing import Optional, Dict, Any
 from config import Config
+from router.memory import deep_sizeof, top_consumers
 
 
 class Cache:
@@ -13,6 +15,15 @@ class Cache:
         self.cache_dir = os.path.join("data", "cache")
         self.cache_file = os.path.join(self.cache_dir, "query_cache.json")
         self.memory_cache = {}
+        # Per-complexity TTLs in seconds: stale after soft, gone after hard
+        self.soft_ttls = config.CACHE_SOFT_TTL
+        self.hard_ttls = config.CACHE_HARD_TTL
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.expired = 0
 
         self._ensure_cache_dir()
         self._load_from_file()
@@ -32,7 +43,7 @@ class Cache:
         if not self.enabled:
             return
 
-        with open(self.cache_file, 'w', encoding='utf-8') as f:
+        with self._lock, open(self.cache_file, 'w', encoding='utf-8') as f:
             # dump(content, file path, space=2, keep non-ASCII chars)
             json.dump(self.memory_cache, f, indent=2, ensure_ascii=False)
 
@@ -40,34 +51,83 @@ class Cache:
         if not self.enabled:
             return None
 
-        if query in self.memory_cache:
-            cache_record = self.memory_cache[query]
+        with self._lock:
+            cache_record = self.memory_cache.get(query)
+            if not cache_record:
+                self.misses += 1
+                return None
+
+            complexity = cache_record.get("complexity", "unknown")
+            age = time.time() - cache_record.get("timestamp", 0)
+
+            # Past the hard TTL the entry is dropped and counts as a miss
+            hard_ttl = self.hard_ttls.get(complexity)
+            if hard_ttl is not None and age > hard_ttl:
+                del self.memory_cache[query]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            soft_ttl = self.soft_ttls.get(complexity)
+            stale = soft_ttl is not None and age > soft_ttl
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+
             return {
                 "response": cache_record["response"],
                 "model": cache_record.get("model", "unknown"),
-                "complexity": cache_record.get("complexity", "unknown"),
-                "timestamp": cache_record.get("timestamp", 0)
+                "complexity": complexity,
+                "timestamp": cache_record.get("timestamp", 0),
+                "stale": stale
             }
 
-        return None
-
     def set(self, query, response, model="unknown", complexity="unknown"):
         if not self.enabled:
             return
 
-        self.memory_cache[query] = {
-            "query": query,
-            "response": response,
-            "model": model,
-            "complexity": complexity,
-            "timestamp": time.time(),
-            "date": datetime.now().isoformat(),
-            "response_length": len(response)
-        }
+        with self._lock:
+            self.memory_cache[query] = {
+                "query": query,
+                "response": response,
+                "model": model,
+                "complexity": complexity,
+                "timestamp": time.time(),
+                "date": datetime.now().isoformat(),
+                "response_length": len(response)
+            }
 
-        self._save_to_file()
+            self._save_to_file()
 
     def clear(self):
-        self.memory_cache = {}
-        if self.enabled and os.path.exists(self.cache_file):
-            os.remove(self.cache_file)
+        with self._lock:
+            self.memory_cache = {}
+            if self.enabled and os.path.exists(self.cache_file):
+                os.remove(self.cache_file)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self.memory_cache),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "expired": self.expired
+            }
+
+    def memory_report(self, top_n: int = 5) -> Dict[str, Any]:
+        # Measure a snapshot so concurrent writers cannot resize the dict
+        # while it is being walked
+        with self._lock:
+            snapshot = dict(self.memory_cache)
+
+        entries = len(snapshot)
+        total_bytes = deep_sizeof(snapshot)
+        return {
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "bytes_per_entry": total_bytes / entries if entries else 0,
+            "top_consumers": top_consumers(snapshot, top_n)
+        }
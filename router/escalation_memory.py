@@ -0,0 +1,118 @@
+import re
+import time
+import threading
+from typing import Optional, Dict, Any
+from config import Config
+from router.memory import deep_sizeof, top_consumers
+
+
+class EscalationMemory:
+    def __init__(self):
+        config = Config()
+        self.enabled = config.ESCALATION_MEMORY_ENABLED
+        self.ttl = config.ESCALATION_MEMORY_TTL
+        self.max_entries = config.ESCALATION_MEMORY_MAX_ENTRIES
+        self.levels = config.MODEL_LEVELS
+        self.memory = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.latency_saved = 0.0
+
+    def _signature(self, query: str):
+        # Same question with different casing / punctuation / spacing
+        # should share one memory entry
+        signature = re.sub(r"[^\w\s]", " ", query.lower())
+        return " ".join(signature.split())
+
+    def get_level(self, query: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        signature = self._signature(query)
+        with self._lock:
+            record = self.memory.get(signature)
+            if record and time.time() - record["timestamp"] > self.ttl:
+                del self.memory[signature]
+                record = None
+
+            if not record:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            record["hits"] += 1
+            # Each hit skips the failing cheaper calls paid when recording
+            self.latency_saved += record["failed_time"]
+            return record["level"]
+
+    def record(self, query: str, level: str, failed_time: float = 0.0):
+        if not self.enabled:
+            return
+
+        signature = self._signature(query)
+        with self._lock:
+            # Re-insert so dict order stays oldest-first
+            self.memory.pop(signature, None)
+            self.memory[signature] = {
+                "level": level,
+                "failed_time": failed_time,
+                "timestamp": time.time(),
+                "hits": 0
+            }
+            self.recorded += 1
+            self._prune()
+
+    def _prune(self):
+        # Entries are oldest-first: drop expired ones from the front,
+        # then evict the oldest while over the size limit
+        now = time.time()
+        while self.memory:
+            oldest = next(iter(self.memory))
+            if (
+                now - self.memory[oldest]["timestamp"] <= self.ttl
+                and len(self.memory) <= self.max_entries
+            ):
+                break
+            del self.memory[oldest]
+
+    def start_level(self, query: str, complexity: str):
+        remembered = self.get_level(query)
+        if not remembered:
+            return complexity
+
+        # Never start below what the classifier asked for
+        return max(remembered, complexity, key=self.levels.index)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) * 100 if lookups else 0.0,
+            "recorded": self.recorded,
+            "latency_saved": self.latency_saved
+        }
+
+    def memory_report(self, top_n: int = 5) -> Dict[str, Any]:
+        # Measure a snapshot so concurrent writers cannot resize the dict
+        # while it is being walked
+        with self._lock:
+            snapshot = dict(self.memory)
+
+        entries = len(snapshot)
+        total_bytes = deep_sizeof(snapshot)
+        return {
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "bytes_per_entry": total_bytes / entries if entries else 0,
+            "top_consumers": top_consumers(snapshot, top_n)
+        }
+
+    def clear(self):
+        with self._lock:
+            self.memory = {}
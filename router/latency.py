@@ -0,0 +1,76 @@
+import time
+import threading
+from typing import Dict, Any
+from config import Config
+
+
+class LatencyTracker:
+    def __init__(self):
+        config = Config()
+        # Seeded with configured guesses, then moved towards observed calls.
+        # Each priority class queues differently, so each keeps its own
+        self.seeds = dict(config.LEVEL_LATENCY_ESTIMATES)
+        self.smoothing = config.LATENCY_SMOOTHING
+        self.half_life = config.LATENCY_DECAY_HALF_LIFE
+        self.estimates = {
+            traffic: {
+                level: {"estimate": seed, "samples": 0, "updated_at": None}
+                for level, seed in self.seeds.items()
+            }
+            for traffic in config.PRIORITY_WEIGHTS
+        }
+        self._lock = threading.Lock()
+
+    def _current(self, record, level: str, now: float) -> float:
+        # Levels that are skipped are never observed again, so old
+        # observations fade back towards the starting guess
+        seed = self.seeds.get(level, 0.0)
+        if record["updated_at"] is None or not self.half_life:
+            return record["estimate"]
+        age = now - record["updated_at"]
+        return seed + (record["estimate"] - seed) * 0.5 ** (
+            age / self.half_life
+        )
+
+    def estimate(self, level: str, traffic: str = "interactive") -> float:
+        record = self.estimates.get(traffic, {}).get(level)
+        if record is None:
+            return self.seeds.get(level, 0.0)
+        with self._lock:
+            return self._current(record, level, time.time())
+
+    def observe(self, level: str, seconds: float,
+                traffic: str = "interactive"):
+        now = time.time()
+        with self._lock:
+            records = self.estimates.setdefault(traffic, {})
+            record = records.setdefault(
+                level,
+                {
+                    "estimate": self.seeds.get(level, seconds),
+                    "samples": 0,
+                    "updated_at": None
+                }
+            )
+            # Exponentially weighted moving average, starting from the seed
+            # so a single outlier cannot replace it outright
+            current = self._current(record, level, now)
+            record["estimate"] = current + self.smoothing * (
+                seconds - current
+            )
+            record["samples"] += 1
+            record["updated_at"] = now
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                traffic: {
+                    level: {
+                        "estimate": self._current(record, level, now),
+                        "samples": record["samples"]
+                    }
+                    for level, record in records.items()
+                }
+                for traffic, records in self.estimates.items()
+            }
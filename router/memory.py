@@ -0,0 +1,78 @@
+import sys
+import tracemalloc
+from typing import List, Dict, Any
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Approximate retained bytes of obj including what it references."""
+    if seen is None:
+        seen = set()
+
+    obj_id = id(obj)
+    if obj_id in seen:
+        return 0
+    seen.add(obj_id)
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+
+    return size
+
+
+def top_consumers(entries: Dict[str, Any], top_n: int = 5):
+    sizes = [
+        {"key": key[:50], "bytes": deep_sizeof(value)}
+        for key, value in entries.items()
+    ]
+    sizes.sort(key=lambda item: item["bytes"], reverse=True)
+    return sizes[:top_n]
+
+
+class MemorySampler:
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+
+    @property
+    def running(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.running:
+            tracemalloc.start(self.frames)
+
+    def stop(self):
+        if self.running:
+            tracemalloc.stop()
+
+    def snapshot(self, top_n: int = 10) -> Dict[str, Any]:
+        if not self.running:
+            return {"running": False}
+
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__)
+        ]).statistics("lineno")
+
+        top: List[Dict[str, Any]] = []
+        for stat in stats[:top_n]:
+            frame = stat.traceback[0]
+            top.append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "bytes": stat.size,
+                "count": stat.count
+            })
+
+        return {
+            "running": True,
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_allocations": top
+        }
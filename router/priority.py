@@ -0,0 +1,130 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Any
+from router.memory import deep_sizeof
+
+
+class QueueWaitError(TimeoutError):
+    pass
+
+
+class PriorityLane:
+    def __init__(self, name: str, weights: Dict[str, int], workers: int):
+        self.name = name
+        self.weights = weights
+        self.queues = {priority: deque() for priority in weights}
+        self.credits = {priority: 0 for priority in weights}
+        self.condition = threading.Condition()
+
+        self.served = {priority: 0 for priority in weights}
+        self.total_wait = {priority: 0.0 for priority in weights}
+        self.max_wait = {priority: 0.0 for priority in weights}
+
+        for _ in range(workers):
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def put(self, priority: str, job):
+        with self.condition:
+            self.queues[priority].append((time.time(), job))
+            self.condition.notify()
+
+    def _next_priority(self):
+        # Smooth weighted round robin over the classes that have work:
+        # interactive goes first most of the time, bulk still gets its
+        # share instead of starving
+        waiting = [p for p, q in self.queues.items() if q]
+        total = sum(self.weights[p] for p in waiting)
+        for priority in waiting:
+            self.credits[priority] += self.weights[priority]
+        chosen = max(waiting, key=lambda p: self.credits[p])
+        self.credits[chosen] -= total
+        return chosen
+
+    def _take(self):
+        with self.condition:
+            while not any(self.queues.values()):
+                self.condition.wait()
+
+            priority = self._next_priority()
+            enqueued_at, job = self.queues[priority].popleft()
+
+            wait = time.time() - enqueued_at
+            self.served[priority] += 1
+            self.total_wait[priority] += wait
+            self.max_wait[priority] = max(self.max_wait[priority], wait)
+            return job
+
+    def _run(self):
+        while True:
+            future, fn, args, kwargs = self._take()
+            # Lets the caller tell time spent queued from time spent running
+            future.started_at = time.time()
+            # Skip jobs whose caller already gave up while they queued
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            priority: {
+                "queued": len(self.queues[priority]),
+                "served": self.served[priority],
+                "average_wait": (
+                    self.total_wait[priority] / self.served[priority]
+                    if self.served[priority] else 0.0
+                ),
+                "max_wait": self.max_wait[priority]
+            }
+            for priority in self.weights
+        }
+
+
+    def memory_report(self) -> Dict[str, Any]:
+        # Pending jobs are what grows when a lane falls behind; count their
+        # arguments, not the futures and callables around them
+        with self.condition:
+            pending = {
+                priority: [job[2:] for _, job in jobs]
+                for priority, jobs in self.queues.items()
+            }
+        return {
+            priority: {
+                "queued": len(jobs),
+                "bytes": deep_sizeof(jobs)
+            }
+            for priority, jobs in pending.items()
+        }
+
+
+class PriorityScheduler:
+    def __init__(self, levels, weights: Dict[str, int],
+                 concurrency: Dict[str, int]):
+        self.weights = weights
+        self.lanes = {
+            level: PriorityLane(level, weights, concurrency[level])
+            for level in levels
+        }
+
+    def submit(self, level: str, priority: str, fn, *args,
+               **kwargs) -> Future:
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        future = Future()
+        self.lanes[level].put(priority, (future, fn, args, kwargs))
+        return future
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            level: lane.get_stats() for level, lane in self.lanes.items()
+        }
+
+    def memory_report(self) -> Dict[str, Any]:
+        return {
+            level: lane.memory_report() for level, lane in self.lanes.items()
+        }
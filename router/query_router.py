@@ -1,57 +1,200 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from router.rules import classify_query
 from router.cache import Cache
-from models.gemini_models import GeminiModels
-from models.mock_model import MockModel
+from router.escalation_memory import EscalationMemory
+from router.memory import MemorySampler, deep_sizeof
+from router.circuit_breaker import CircuitBreaker, CircuitOpenError
+from router.latency import LatencyTracker
+from router.batcher import MicroBatcher
+from router.priority import PriorityScheduler, QueueWaitError
+from router.validation import ResponseValidator
+from models.registry import create_model
 from config import Config
 
 
 class QueryRouter:
 
-    def __init__(self):
+    def __init__(self, model_provider=None):
         self.config = Config()
+        if model_provider:
+            self.config.MODEL_PROVIDER = model_provider
         self.cache = Cache()
+        self.escalation_memory = EscalationMemory()
+        self.memory_sampler = MemorySampler()
+        self.request_count = 0
+        self.measured_requests = 0
+        self.request_bytes = 0
+        self.last_request_bytes = 0
+        self.breakers = {
+            level: CircuitBreaker(
+                level,
+                self.config.BREAKER_FAILURE_THRESHOLD,
+                self.config.BREAKER_RECOVERY_TIMEOUT
+            )
+            for level in self.config.MODEL_LEVELS
+        }
+        self.latency = LatencyTracker()
+        self.validator = ResponseValidator(self.config.INVALID_PHRASES)
+        self.early_aborts = 0
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=self.config.CACHE_REFRESH_WORKERS
+        )
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+        self.refresh_failures = 0
+        # Upstream calls wait in weighted per-level priority lanes
+        self.scheduler = PriorityScheduler(
+            self.config.MODEL_LEVELS,
+            self.config.PRIORITY_WEIGHTS,
+            self.config.LEVEL_CONCURRENCY
+        )
+
+        # Select model provider based on config (imported on first use)
+        self.model = create_model(self.config.MODEL_PROVIDER)
 
-        # Select model provider based on config
-        if self.config.MODEL_PROVIDER == "gemini":
-            self.model = GeminiModels()
-        elif self.config.MODEL_PROVIDER == "mock":
-            self.model = MockModel()
-        else:
-            raise ValueError(
-                "Unknown model provider: ",
-                self.config.MODEL_PROVIDER
+        self.batcher = None
+        if (
+            self.config.MICRO_BATCHING_ENABLED
+            and self.model.has_native_batching()
+        ):
+            self.batcher = MicroBatcher(
+                self.model,
+                self.config.BATCH_LEVELS,
+                self.config.BATCH_WINDOW,
+                self.config.BATCH_MAX_SIZE,
+                dispatch=self.scheduler.submit
             )
 
-    def route_query_and_return_response(self, query, use_cache=True):
+    def route_query_and_return_response(self, query, use_cache=True,
+                                        budget=None, deadline=None,
+                                        sla=None, priority="interactive"):
+        # deadline is an absolute time.time(); budget is seconds from now;
+        # sla picks the default budget of a traffic class; priority picks
+        # the queue lane ("interactive" or "bulk")
+        deadline = self._resolve_deadline(budget, deadline, sla)
+
         cached_result = self._check_cache(query, use_cache)
         if cached_result:
+            self._track_request_size(cached_result)
             return cached_result
 
-        complexity = classify_query(query)
-        model_level = complexity
+        complexity = classify_query(query, self.config)
+        # Start directly at the level this query escalated to last time
+        model_level = self.escalation_memory.start_level(query, complexity)
+        # Drop to a level that can still answer before the deadline
+        model_level = self._fit_level_to_deadline(
+            model_level,
+            deadline,
+            priority
+        )
         # send the model level based on complexity and return the model used
         # in case of fallback
         response, model = self._get_response_with_fallback(
             query,
             model_level,
-            complexity
-        )
-
-        self._cache_response(
-            query,
-            response,
-            model,
             complexity,
-            use_cache
+            deadline=deadline,
+            priority=priority
         )
 
-        return {
+        # An invalid answer returned because nothing better arrived in
+        # time is passed on, but not cached
+        degraded = not self._is_response_valid(response)
+        if not degraded:
+            self._cache_response(
+                query,
+                response,
+                model,
+                complexity,
+                use_cache
+            )
+
+        result = {
             "query": query,
             "response": response,
             "complexity": complexity,
             "model_name": model,
-            "cached": False
+            "cached": False,
+            "degraded": degraded
         }
+        self._track_request_size(result)
+        return result
+
+    def generate_at_level(self, query: str, model_level: str,
+                          budget=None, deadline=None, sla=None,
+                          priority="interactive"):
+        # Skips classification and fallback, but keeps timeouts and breakers
+        deadline = self._resolve_deadline(budget, deadline, sla)
+        return self._call_model(query, model_level, deadline, priority)
+
+    def _resolve_deadline(self, budget, deadline, sla):
+        if deadline is not None:
+            return deadline
+
+        if budget is None and sla is not None:
+            if sla not in self.config.SLA_BUDGETS:
+                raise ValueError(f"Unknown SLA class: {sla}")
+            budget = self.config.SLA_BUDGETS[sla]
+
+        if budget is None:
+            return None
+        return time.time() + budget
+
+    def _time_left(self, deadline):
+        if deadline is None:
+            return None
+        return deadline - time.time()
+
+    def _fits_deadline(self, model_level: str, deadline,
+                       priority: str = "interactive"):
+        time_left = self._time_left(deadline)
+        if time_left is None:
+            return True
+        return self.latency.estimate(model_level, priority) <= time_left
+
+    def _fit_level_to_deadline(self, model_level: str, deadline,
+                               priority: str = "interactive"):
+        if deadline is None:
+            return model_level
+
+        levels = self.config.MODEL_LEVELS
+        for index in range(levels.index(model_level), -1, -1):
+            if self._fits_deadline(levels[index], deadline, priority):
+                if levels[index] != model_level:
+                    print(f"Starting at {levels[index]} model "
+                          f"to meet the deadline...")
+                return levels[index]
+
+        # Nothing fits: go with the fastest level and a capped answer
+        return levels[0]
+
+    def _max_tokens_for_deadline(self, model_level: str, deadline,
+                                 priority: str = "interactive"):
+        time_left = self._time_left(deadline)
+        estimate = self.latency.estimate(model_level, priority)
+        if time_left is None or estimate <= 0 or time_left >= estimate:
+            return None
+
+        # Generation time grows roughly with answer length
+        max_tokens = self.config.LEVEL_MAX_TOKENS[model_level]
+        return max(
+            self.config.MIN_DEADLINE_TOKENS,
+            int(max_tokens * time_left / estimate)
+        )
+
+    def _track_request_size(self, result):
+        self.request_count += 1
+        # Walking every result is not free, so only measure while memory
+        # sampling is switched on
+        if not self.memory_sampler.running:
+            return
+
+        self.last_request_bytes = deep_sizeof(result)
+        self.request_bytes += self.last_request_bytes
+        self.measured_requests += 1
 
     def _check_cache(self, query: str, use_cache: bool):
         if not use_cache or not self.cache.enabled:
@@ -59,16 +202,60 @@ class QueryRouter:
 
         cached_data = self.cache.get(query)
         if cached_data:
+            # Serve the stale answer now, refresh it for the next caller
+            if cached_data["stale"]:
+                self._schedule_refresh(query)
+
             return {
                 "query": query,
                 "response": cached_data["response"],
                 "complexity": cached_data['complexity'],
                 "model_name": cached_data["model"],
                 "cached": True,
+                "stale": cached_data["stale"],
                 "timestamp": cached_data["timestamp"]
             }
         return None
 
+    def _schedule_refresh(self, query: str):
+        with self._refresh_lock:
+            if query in self._refreshing:
+                return
+            self._refreshing.add(query)
+
+        self._refresh_executor.submit(self._refresh_cache_entry, query)
+
+    def _refresh_cache_entry(self, query: str):
+        try:
+            complexity = classify_query(query, self.config)
+            model_level = self.escalation_memory.start_level(
+                query,
+                complexity
+            )
+            # Refreshes only use capacity live traffic leaves over
+            response, model = self._get_response_with_fallback(
+                query,
+                model_level,
+                complexity,
+                priority="bulk"
+            )
+
+            # Keep the old answer rather than replace it with a bad one
+            if self._is_response_valid(response):
+                self._cache_response(query, response, model, complexity,
+                                     use_cache=True)
+                self.refreshes += 1
+            else:
+                self.refresh_failures += 1
+
+        except Exception as e:
+            print(f"Cache refresh failed: {e!r}")
+            self.refresh_failures += 1
+
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(query)
+
     def _cache_response(self, query: str, response: str, model_name: str,
                         complexity: str, use_cache: bool):
         if use_cache and self.cache.enabled:
@@ -80,11 +267,46 @@ class QueryRouter:
             )
 
     def _get_response_with_fallback(self, query: str, model_level: str,
-                                    complexity: str, retries: int = 0):
-        response = self.model.generate(query, model_level)
+                                    complexity: str, retries: int = 0,
+                                    failed_time: float = 0.0,
+                                    deadline=None, priority="interactive",
+                                    rejected: bool = False,
+                                    last_answer=None):
+        start_time = time.time()
+        error = None
+        # Cutting a refusal short only pays off if a higher level can
+        # still answer; otherwise the full answer is worth more
+        next_level = self._next_level(model_level)
+        can_escalate = bool(
+            self.config.FALLBACK_ENABLED
+            and retries < self.config.MAX_RETRIES
+            and next_level
+            and self._fits_deadline(next_level, deadline, priority)
+        )
+        try:
+            response = self._call_model(
+                query,
+                model_level,
+                deadline,
+                priority,
+                abort_on_refusal=can_escalate
+            )
+        except Exception as e:
+            # Timed out, errored or circuit open: treat like a bad answer
+            print(f"{model_level} model failed: {e!r}")
+            error = e
+            response = None
+
+        # Keep the latest answer in case higher levels fail or run late
+        if response is not None:
+            last_answer = (response, model_level)
 
         # Check if response is valid
         if self._is_response_valid(response):
+            # Remember the level that worked after a lower level gave an
+            # invalid answer; outages and timeouts are not the query's fault
+            if rejected:
+                self.escalation_memory.record(query, model_level, failed_time)
             # If valid, return response and model name
             return response, self._get_model_name(model_level)
 
@@ -92,31 +314,234 @@ class QueryRouter:
         elif (
             self.config.FALLBACK_ENABLED
             and retries < self.config.MAX_RETRIES
+            and self._next_level(model_level)
+            and self._fallback_fits_deadline(model_level, deadline,
+                                             priority)
+        ):
+            failed_time += time.time() - start_time
+            return self._try_fallback(
+                query,
+                model_level,
+                complexity,
+                retries,
+                failed_time,
+                deadline,
+                priority,
+                rejected or error is None,
+                last_answer
+            )
+
+        # Nothing left to fall back to: return the best (invalid) answer
+        # any level gave, and only fail if none answered at all
+        if last_answer is None:
+            raise error
+
+        response, answer_level = last_answer
+        return response, self._get_model_name(answer_level)
+
+    def _fallback_fits_deadline(self, model_level: str, deadline,
+                                priority: str = "interactive"):
+        next_level = self._next_level(model_level)
+        # Without a next level _try_fallback reports the problem itself
+        if (
+            not next_level
+            or self._fits_deadline(next_level, deadline, priority)
         ):
-            return self._try_fallback(query, model_level, complexity, retries)
+            return True
 
-        # If no fallback, return the (invalid) response and model name
-        return response, self._get_model_name(model_level)
+        print(f"Skipping {next_level} model: not enough time left...")
+        return False
+
+    def _call_model(self, query: str, model_level: str, deadline=None,
+                    priority: str = "interactive",
+                    abort_on_refusal: bool = False):
+        timeout = self.config.LEVEL_TIMEOUTS.get(model_level)
+        time_left = self._time_left(deadline)
+        if time_left is not None:
+            if time_left <= 0:
+                raise TimeoutError("deadline already passed")
+            timeout = min(timeout, time_left) if timeout else time_left
+
+        if priority not in self.config.PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        breaker = self.breakers[model_level]
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"{model_level} model circuit is open")
+
+        # Only pass a cap when needed so providers without it keep working
+        kwargs = {}
+        max_tokens = self._max_tokens_for_deadline(
+            model_level,
+            deadline,
+            priority
+        )
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+
+        start_time = time.time()
+        streaming = False
+        # Set once this caller gives up, so the stream stops being read
+        stop = threading.Event()
+        try:
+            # Capped requests need their own call, so they are never batched
+            if (
+                self.batcher and self.batcher.handles(model_level)
+                and not kwargs
+            ):
+                future = self.batcher.submit(query, model_level, priority)
+            # Streaming only pays off when a refusal can be cut short
+            elif self.config.STREAM_VALIDATION_ENABLED and abort_on_refusal:
+                streaming = True
+                future = self.scheduler.submit(
+                    model_level,
+                    priority,
+                    self._generate_validated,
+                    query,
+                    model_level,
+                    stop,
+                    **kwargs
+                )
+            else:
+                future = self.scheduler.submit(
+                    model_level,
+                    priority,
+                    self.model.generate,
+                    query,
+                    model_level,
+                    **kwargs
+                )
+        except Exception:
+            breaker.release()
+            raise
+
+        try:
+            response = future.result(timeout=timeout)
+        except Exception:
+            if future.done() and not future.cancelled():
+                breaker.record_failure()
+                raise
+            try:
+                response = self._wait_after_timeout(
+                    future,
+                    model_level,
+                    deadline,
+                    breaker,
+                    start_time
+                )
+            except Exception:
+                stop.set()
+                raise
+
+        aborted = False
+        if streaming:
+            response, aborted = response
+
+        breaker.record_success()
+        # A cut-off refusal says nothing about how long full answers take
+        if not aborted:
+            self.latency.observe(
+                model_level,
+                time.time() - start_time,
+                priority
+            )
+        return response
+
+    def _wait_after_timeout(self, future, model_level: str, deadline,
+                            breaker, queued_at: float):
+        # Still queued means the lane was busy, not that the model failed,
+        # so the breaker only gets its probe slot back
+        if future.cancel():
+            breaker.release()
+            raise QueueWaitError(
+                f"queue wait exceeded for {model_level} model "
+                f"({time.time() - queued_at:.1f}s)"
+            )
+
+        # The level timeout bounds run time, not time spent queued: a call
+        # that started late gets the rest of it, as far as the deadline allows
+        started_at = getattr(future, "started_at", None) or time.time()
+        level_timeout = self.config.LEVEL_TIMEOUTS.get(model_level)
+        remaining = self._time_left(deadline)
+        if level_timeout:
+            run_left = started_at + level_timeout - time.time()
+            remaining = (
+                run_left if remaining is None else min(remaining, run_left)
+            )
+
+        try:
+            return future.result(timeout=max(remaining, 0))
+        except Exception:
+            run_time = time.time() - started_at
+            # A timed out call keeps its worker until the SDK gives up, but
+            # the request moves on immediately
+            if future.done() or (level_timeout and run_time >= level_timeout):
+                breaker.record_failure()
+                raise
+
+            breaker.release()
+            if started_at - queued_at >= run_time:
+                raise QueueWaitError(
+                    f"queue wait exceeded for {model_level} model "
+                    f"({started_at - queued_at:.1f}s queued, "
+                    f"{run_time:.1f}s running)"
+                )
+            raise TimeoutError(
+                f"deadline passed while {model_level} model was running"
+            )
 
     def _is_response_valid(self, response: str):
-        if not response or len(response.strip()) < 5:
-            return False
+        return self.validator.is_valid(response)
 
-        # Check if response starts with any invalid phrases
-        for phrase in self.config.INVALID_PHRASES:
-            if response.startswith(phrase):
-                return False
+    def _generate_validated(self, query: str, model_level: str,
+                            stop: threading.Event, **kwargs):
+        # Returns (text, aborted). The SDK timeout applies to each read, so
+        # the stream is also closed once the caller stops waiting
+        stream = self.model.generate_stream(query, model_level, **kwargs)
+        parts = []
+        checking = True
+        aborted = False
 
-        return True
+        try:
+            for chunk in stream:
+                if stop.is_set():
+                    aborted = True
+                    break
 
-    def _try_fallback(self, query: str, current_level: str,
-                      complexity: str, retries: int):
+                parts.append(chunk)
+                if not checking:
+                    continue
+
+                verdict = self.validator.check_prefix("".join(parts))
+                if verdict:
+                    # A refusal: stop paying for the rest of it
+                    print(f"Refusal from {model_level} model, "
+                          f"stopping generation...")
+                    self.early_aborts += 1
+                    aborted = True
+                    break
+                checking = verdict is None
+
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+        return "".join(parts), aborted
+
+    def _next_level(self, current_level: str):
         upgrade_map = {
             "simple": "medium",
             "medium": "advanced"
         }
+        return upgrade_map.get(current_level)
 
-        next_level = upgrade_map.get(current_level)
+    def _try_fallback(self, query: str, current_level: str,
+                      complexity: str, retries: int,
+                      failed_time: float = 0.0, deadline=None,
+                      priority: str = "interactive",
+                      rejected: bool = False, last_answer=None):
+        next_level = self._next_level(current_level)
         if not next_level:
             raise Exception(f"No fallback available for {current_level} model")
 
@@ -125,7 +550,12 @@ class QueryRouter:
             query,
             next_level,
             complexity,
-            retries + 1
+            retries + 1,
+            failed_time,
+            deadline,
+            priority,
+            rejected,
+            last_answer
         )
 
     def _get_model_name(self, model_level: str):
@@ -136,6 +566,104 @@ class QueryRouter:
         }
         return model_names.get(model_level, self.config.SIMPLE_MODEL)
 
+    def get_stats(self):
+        return {
+            "cache": dict(
+                self.cache.get_stats(),
+                refreshes=self.refreshes,
+                refresh_failures=self.refresh_failures,
+                refreshing=len(self._refreshing)
+            ),
+            "escalation_memory": self.escalation_memory.get_stats(),
+            "circuit_breakers": {
+                level: breaker.get_stats()
+                for level, breaker in self.breakers.items()
+            },
+            "latency_estimates": self.latency.get_stats(),
+            "early_aborts": self.early_aborts,
+            "priority_lanes": self.scheduler.get_stats(),
+            "micro_batching": (
+                self.batcher.get_stats() if self.batcher else None
+            )
+        }
+
+    def _router_state_report(self):
+        # The parts of the router that grow while it runs: pending jobs,
+        # in-flight refreshes and per-level bookkeeping
+        with self._refresh_lock:
+            refreshing = set(self._refreshing)
+
+        state = {
+            "priority_lanes": self.scheduler.memory_report(),
+            "micro_batching": (
+                self.batcher.memory_report() if self.batcher else None
+            ),
+            "refreshing": {
+                "entries": len(refreshing),
+                "bytes": deep_sizeof(refreshing)
+            },
+            "latency_bytes": deep_sizeof(self.latency.estimates),
+            "breaker_bytes": deep_sizeof(self.breakers),
+            # Provider clients hold SDK internals; only count their level
+            # table
+            "config_bytes": (
+                deep_sizeof(self.config)
+                + deep_sizeof(getattr(self.model, "models", {}))
+            )
+        }
+
+        queued = [
+            lane
+            for lanes in state["priority_lanes"].values()
+            for lane in lanes.values()
+        ] + list((state["micro_batching"] or {}).values())
+        state["queued"] = sum(item["queued"] for item in queued)
+        state["total_bytes"] = (
+            sum(item["bytes"] for item in queued)
+            + state["refreshing"]["bytes"]
+            + state["latency_bytes"]
+            + state["breaker_bytes"]
+            + state["config_bytes"]
+        )
+        return state
+
+    def memory_report(self, top_n: int = 5):
+        cache_report = self.cache.memory_report(top_n)
+        escalation_report = self.escalation_memory.memory_report(top_n)
+        router_state = self._router_state_report()
+
+        consumers = [
+            dict(item, source="cache")
+            for item in cache_report["top_consumers"]
+        ] + [
+            dict(item, source="escalation_memory")
+            for item in escalation_report["top_consumers"]
+        ]
+        consumers.sort(key=lambda item: item["bytes"], reverse=True)
+
+        return {
+            "cache": cache_report,
+            "escalation_memory": escalation_report,
+            "router_state": router_state,
+            "router_state_bytes": router_state["total_bytes"],
+            "requests": {
+                "count": self.request_count,
+                "measured": self.measured_requests,
+                "last_bytes": self.last_request_bytes,
+                "average_bytes": (
+                    self.request_bytes / self.measured_requests
+                    if self.measured_requests else 0
+                )
+            },
+            "total_bytes": (
+                cache_report["total_bytes"]
+                + escalation_report["total_bytes"]
+                + router_state["total_bytes"]
+            ),
+            "top_consumers": consumers[:top_n],
+            "tracemalloc": self.memory_sampler.snapshot(top_n)
+        }
+
 
 if __name__ == "__main__":
     router = QueryRouter()
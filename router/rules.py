@@ -1,9 +1,13 @@
 import re
 from config import Config
 
+SIMPLE_FACTUAL_PATTERN = re.compile(
+    r'^(what|when|where|who|how|is|are|can|do|does)\s+'
+)
 
-def classify_query(query):
-    config = Config()
+
+def classify_query(query, config=None):
+    config = config or Config()
     query_length = len(query)
 
     if query_length <= config.MAX_SIMPLE_LENGTH:
@@ -11,9 +15,9 @@ def classify_query(query):
             return "simple"
 
     if query_length <= config.MAX_MEDIUM_LENGTH:
-        if has_complex_keywords(query):
+        if has_complex_keywords(query, config):
             return "advanced"
-        elif has_simple_keywords(query):
+        elif has_simple_keywords(query, config):
             return "medium"
         else:
             return "medium"
@@ -22,17 +26,16 @@ def classify_query(query):
 
 
 def is_simple_factual(query):
-    simple_pattern = r'^(what|when|where|who|how|is|are|can|do|does)\s+'
-    return re.match(simple_pattern, query.lower()) is not None
+    return SIMPLE_FACTUAL_PATTERN.match(query.lower()) is not None
 
 
-def has_complex_keywords(query):
-    config = Config()
+def has_complex_keywords(query, config=None):
+    config = config or Config()
     query_lower = query.lower()
     return any(keyword in query_lower for keyword in config.COMPLEX_KEYWORDS)
 
 
-def has_simple_keywords(query):
-    config = Config()
+def has_simple_keywords(query, config=None):
+    config = config or Config()
     query_lower = query.lower()
     return any(keyword in query_lower for keyword in config.SIMPLE_KEYWORDS)
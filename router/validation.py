@@ -0,0 +1,42 @@
+import re
+from typing import Optional
+
+
+class ResponseValidator:
+    def __init__(self, invalid_phrases, min_length: int = 5):
+        self.min_length = min_length
+        self.phrases = [self._normalize(p) for p in invalid_phrases]
+        # One case-insensitive matcher for every phrase, longest first
+        self.matcher = re.compile(
+            "|".join(
+                re.escape(phrase)
+                for phrase in sorted(self.phrases, key=len, reverse=True)
+            ) or "(?!)",
+            re.IGNORECASE
+        )
+
+    def _normalize(self, text: str):
+        # Models often answer with typographic apostrophes
+        return text.replace("’", "'").lstrip().lower()
+
+    def is_valid(self, response: str) -> bool:
+        if not response or len(response.strip()) < self.min_length:
+            return False
+
+        # Check if response starts with any invalid phrase
+        return self.matcher.match(self._normalize(response)) is None
+
+    def check_prefix(self, partial: str) -> Optional[bool]:
+        """True: refusal, False: cannot become one, None: undecided."""
+        text = self._normalize(partial)
+        if not text:
+            return None
+
+        if self.matcher.match(text):
+            return True
+
+        # Still a possible refusal while some phrase starts with the text
+        for phrase in self.phrases:
+            if phrase.startswith(text):
+                return None
+        return False